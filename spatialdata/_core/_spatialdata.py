@@ -5,7 +5,7 @@ import os
 import shutil
 from collections.abc import Generator
 from types import MappingProxyType
-from typing import Optional, Union
+from typing import TYPE_CHECKING, Any, Optional, Union
 
 import zarr
 from anndata import AnnData
@@ -45,6 +45,9 @@ from spatialdata._io.write import (
 )
 from spatialdata._logging import logger
 
+if TYPE_CHECKING:
+    import networkx as nx
+
 # schema for elements
 Label2D_s = Labels2DModel()
 Label3D_s = Labels3DModel()
@@ -111,6 +114,8 @@ class SpatialData:
     _shapes: dict[str, AnnData] = MappingProxyType({})  # type: ignore[assignment]
     _table: Optional[AnnData] = None
     path: Optional[str] = None
+    # (cache key, graph) pair, see spatialdata._core._spatialdata_ops._build_transformations_graph()
+    _transformations_graph_cache: Optional[tuple[Any, nx.Graph]] = None
 
     def __init__(
         self,
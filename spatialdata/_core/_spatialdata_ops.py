@@ -4,16 +4,28 @@ from typing import Optional, Union
 
 import networkx as nx
 import numpy as np
+from multiscale_spatial_image import MultiscaleSpatialImage
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import breadth_first_order, shortest_path
 
 from spatialdata._core._spatialdata import SpatialData
 from spatialdata._core.core_utils import (
     DEFAULT_COORDINATE_SYSTEM,
     SpatialElement,
+    _bump_transformations_version,
     _get_transformations,
+    _get_transformations_version,
     _set_transformations,
     has_type_spatial_element,
 )
-from spatialdata._core.transformations import BaseTransformation, Identity, Sequence
+from spatialdata._core.transformations import (
+    Affine,
+    BaseTransformation,
+    Identity,
+    MapAxis,
+    Scale,
+    Sequence,
+)
 
 __all__ = [
     "set_transformation",
@@ -58,7 +70,12 @@ def set_transformation(
             if to_coordinate_system is None:
                 to_coordinate_system = DEFAULT_COORDINATE_SYSTEM
             transformations[to_coordinate_system] = transformation
-            _set_transformations(element, transformations)
+            if isinstance(element, MultiscaleSpatialImage):
+                # the transformations of the other levels are derived from the ones of scale0, they need to be updated
+                _set_transformations(element, transformations)
+            else:
+                # the dict is the one stored in the element, so it has already been updated in place
+                _bump_transformations_version()
         else:
             assert isinstance(transformation, dict)
             assert to_coordinate_system is None
@@ -104,9 +121,10 @@ def get_transformation(
         if to_coordinate_system is None:
             to_coordinate_system = DEFAULT_COORDINATE_SYSTEM
         # get a specific transformation
-        if to_coordinate_system not in transformations:
-            raise ValueError(f"Transformation to {to_coordinate_system} not found")
-        return transformations[to_coordinate_system]
+        try:
+            return transformations[to_coordinate_system]
+        except KeyError:
+            raise ValueError(f"Transformation to {to_coordinate_system} not found") from None
     else:
         assert to_coordinate_system is None
         # get the dict of all the transformations
@@ -140,11 +158,14 @@ def remove_transformation(
             assert transformations is not None
             if to_coordinate_system is None:
                 to_coordinate_system = DEFAULT_COORDINATE_SYSTEM
-            del transformations[to_coordinate_system]
+            if transformations.pop(to_coordinate_system, None) is None:
+                raise ValueError(f"Transformation to {to_coordinate_system} not found")
             _set_transformations(element, transformations)
         else:
             assert to_coordinate_system is None
-            _set_transformations(element, {})
+            transformations = _get_transformations(element)
+            if transformations is None or len(transformations) > 0:
+                _set_transformations(element, {})
     else:
         if not write_to_sdata.contains_element(element):
             raise ValueError("The element is not part of the SpatialData object.")
@@ -158,24 +179,166 @@ def remove_transformation(
         write_to_sdata._write_transformations_to_disk(element)
 
 
+def _resolve_node(g: nx.Graph, coordinate_system: Union[SpatialElement, str]) -> Union[int, str]:
+    # in the transformations graph, intrinsic coordinate systems (elements) are represented by their index and
+    # extrinsic coordinate systems by their name
+    if has_type_spatial_element(coordinate_system):
+        element_index = g.graph["element_index"]
+        if id(coordinate_system) not in element_index:
+            raise ValueError("The element is not part of the SpatialData object.")
+        index = element_index[id(coordinate_system)]
+        assert isinstance(index, int)
+        return index
+    assert isinstance(coordinate_system, str)
+    return coordinate_system
+
+
+def _describe_paths(g: nx.Graph, paths: list[list[Union[int, str]]]) -> str:
+    paths_str = ""
+    for p in paths:
+        components = []
+        for c in p:
+            if isinstance(c, str):
+                components.append(f"{c!r}")
+            else:
+                element_type, element_name = g.graph["elements"][c]
+                components.append(f"<sdata>.{element_type}[{element_name!r}]")
+        paths_str += "\n    " + " -> ".join(components)
+    return paths_str
+
+
+def _is_invertible(t: BaseTransformation) -> bool:
+    if isinstance(t, Affine):
+        # the determinant is zero exactly when np.linalg.inv() would fail, and it is cheaper than computing the inverse
+        return t.matrix.shape[0] == t.matrix.shape[1] and np.linalg.det(t.matrix) != 0
+    elif isinstance(t, Scale):
+        return bool(np.all(t.scale != 0))
+    elif isinstance(t, MapAxis):
+        return len(t.map_axis.values()) == len(set(t.map_axis.values()))
+    elif isinstance(t, Sequence):
+        return all(_is_invertible(tt) for tt in t.transformations)
+    else:
+        return True
+
+
+def _can_traverse(g: nx.Graph, u: Union[int, str], v: Union[int, str]) -> bool:
+    data = g[u][v]
+    # invertibility is checked at query time, since the transformation could have been modified in place after the
+    # (cached) graph was built
+    return bool(data["forward_from"] == u or _is_invertible(data["transformation"]))
+
+
+def _get_edge_transformation(g: nx.Graph, u: Union[int, str], v: Union[int, str]) -> BaseTransformation:
+    data = g[u][v]
+    if data["forward_from"] == u:
+        transformation = data["transformation"]
+    else:
+        # the inverse is not stored in the (cached) graph: the transformation could be modified in place, and the
+        # inverse would then be stale
+        transformation = data["transformation"].inverse()
+    assert isinstance(transformation, BaseTransformation)
+    return transformation
+
+
+def _get_all_simple_paths(g: nx.Graph, source: Union[int, str], target: Union[int, str]) -> list[list[Union[int, str]]]:
+    # the graph is undirected, so we need to discard the paths that go backwards through a non-invertible edge
+    return [
+        p
+        for p in nx.all_simple_paths(g, source=source, target=target)
+        if all(_can_traverse(g, u, v) for u, v in zip(p[:-1], p[1:]))
+    ]
+
+
+def _compose_affine_path(g: nx.Graph, path: list[Union[int, str]]) -> Optional[Affine]:
+    # when the transformations along the path are affine and the output axes of each one are the input axes of the
+    # next, the chain can be replaced by a single affine, so that applying it to an element requires one pass over the
+    # data instead of one per transformation
+    steps = []
+    for u, v in zip(path[:-1], path[1:]):
+        data = g[u][v]
+        t = data["transformation"]
+        if not isinstance(t, Affine):
+            return None
+        forward = data["forward_from"] == u
+        input_axes, output_axes = (t.input_axes, t.output_axes) if forward else (t.output_axes, t.input_axes)
+        steps.append((t.matrix, forward, input_axes, output_axes))
+    if any(s0[3] != s1[2] for s0, s1 in zip(steps[:-1], steps[1:])):
+        return None
+    matrix = np.eye(len(steps[0][2]) + 1)
+    for m, forward, _, _ in steps:
+        # edges walked backwards are invertible, hence square; solving is cheaper and more accurate than forming the
+        # inverse explicitly
+        matrix = m @ matrix if forward else np.linalg.solve(m, matrix)
+    return Affine(matrix, input_axes=steps[0][2], output_axes=steps[-1][3])
+
+
 def _build_transformations_graph(sdata: SpatialData) -> nx.Graph:
-    g = nx.DiGraph()
-    gen = sdata._gen_elements_values()
+    elements = list(sdata._gen_elements())
+    # the graph only depends on which elements are in sdata and on their transformations, so it can be reused until
+    # one of them changes. The transformations version is bumped every time a transformation is set or removed.
+    cache_key = (_get_transformations_version(), tuple((t, n, id(e)) for t, n, e in elements))
+    if sdata._transformations_graph_cache is not None and sdata._transformations_graph_cache[0] == cache_key:
+        return sdata._transformations_graph_cache[1]
+
+    g = nx.Graph()
+    # elements are represented by their position in sdata._gen_elements(), this makes the graph independent of the
+    # objects in memory
+    g.graph["elements"] = [(element_type, element_name) for element_type, element_name, _ in elements]
+    g.graph["element_index"] = {id(e): i for i, (_, _, e) in enumerate(elements)}
     for cs in sdata.coordinate_systems:
         g.add_node(cs)
-    for e in gen:
-        g.add_node(id(e))
+    for i, (_, _, e) in enumerate(elements):
+        g.add_node(i)
         transformations = get_transformation(e, get_all=True)
         assert isinstance(transformations, dict)
         for cs, t in transformations.items():
-            g.add_edge(id(e), cs, transformation=t)
-            try:
-                g.add_edge(cs, id(e), transformation=t.inverse())
-            except np.linalg.LinAlgError:
-                pass
+            # one edge per (element, coordinate system) pair; the inverse is computed only if a path goes through this
+            # edge from the coordinate system to the element, see _get_edge_transformation()
+            g.add_edge(i, cs, forward_from=i, transformation=t)
+    nodes = list(g.nodes)
+    g.graph["nodes"] = nodes
+    g.graph["node_index"] = {node: i for i, node in enumerate(nodes)}
+    sdata._transformations_graph_cache = (cache_key, g)
     return g
 
 
+def _get_adjacency(g: nx.Graph) -> csr_matrix:
+    # directed integer representation of the graph, used to answer the path queries with scipy.sparse.csgraph. It is
+    # not cached with the graph because which edges can be walked backwards depends on the current transformations
+    node_index = g.graph["node_index"]
+    rows = []
+    cols = []
+    for u, v in g.edges:
+        for a, b in ((u, v), (v, u)):
+            if _can_traverse(g, a, b):
+                rows.append(node_index[a])
+                cols.append(node_index[b])
+    n = len(node_index)
+    return csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(n, n))
+
+
+def _get_shortest_path(adjacency: csr_matrix, source: int, target: int) -> Optional[list[int]]:
+    _, predecessors = shortest_path(adjacency, unweighted=True, indices=source, return_predecessors=True)
+    if predecessors[target] < 0:
+        return None
+    path = [target]
+    while path[-1] != source:
+        path.append(predecessors[path[-1]])
+    return path[::-1]
+
+
+def _is_unique_path(adjacency: csr_matrix, path: list[int]) -> bool:
+    # any other simple path between the same nodes misses at least one edge of this path, so the path is unique if and
+    # only if removing any of its edges disconnects the source from the target
+    for i, j in zip(path[:-1], path[1:]):
+        pruned = adjacency.copy()
+        pruned[i, j] = 0
+        pruned.eliminate_zeros()
+        if path[-1] in breadth_first_order(pruned, path[0], return_predecessors=False):
+            return False
+    return True
+
+
 def get_transformation_between_coordinate_systems(
     sdata: SpatialData,
     source_coordinate_system: Union[SpatialElement, str],
@@ -199,85 +362,62 @@ def get_transformation_between_coordinate_systems(
     The transformation to map the source coordinate system to the target coordinate system.
     """
 
-    def _describe_paths(paths: list[list[Union[int, str]]]) -> str:
-        paths_str = ""
-        for p in paths:
-            components = []
-            for c in p:
-                if isinstance(c, str):
-                    components.append(f"{c!r}")
-                else:
-                    ss = [
-                        f"<sdata>.{element_type}[{element_name!r}]"
-                        for element_type, element_name, e in sdata._gen_elements()
-                        if id(e) == c
-                    ]
-                    assert len(ss) == 1
-                    components.append(ss[0])
-            paths_str += "\n    " + " -> ".join(components)
-        return paths_str
-
-    if (
+    # mapping a coordinate system to itself doesn't require the transformations graph
+    if source_coordinate_system is target_coordinate_system or (
         isinstance(source_coordinate_system, str)
         and isinstance(target_coordinate_system, str)
         and source_coordinate_system == target_coordinate_system
-        or id(source_coordinate_system) == id(target_coordinate_system)
     ):
+        if has_type_spatial_element(source_coordinate_system) and not sdata.contains_element(source_coordinate_system):
+            raise ValueError("The element is not part of the SpatialData object.")
         return Identity()
-    else:
-        g = _build_transformations_graph(sdata)
-        src_node: Union[int, str]
-        if has_type_spatial_element(source_coordinate_system):
-            src_node = id(source_coordinate_system)
-        else:
-            assert isinstance(source_coordinate_system, str)
-            src_node = source_coordinate_system
-        tgt_node: Union[int, str]
-        if has_type_spatial_element(target_coordinate_system):
-            tgt_node = id(target_coordinate_system)
+
+    g = _build_transformations_graph(sdata)
+    src_node = _resolve_node(g, source_coordinate_system)
+    tgt_node = _resolve_node(g, target_coordinate_system)
+    adjacency = _get_adjacency(g)
+    node_index = g.graph["node_index"]
+    indices = None
+    if src_node in node_index and tgt_node in node_index:
+        indices = _get_shortest_path(adjacency, node_index[src_node], node_index[tgt_node])
+    if indices is None:
+        # error 0 (we refer to this in the tests)
+        raise RuntimeError("No path found between the two coordinate systems")
+    path = [g.graph["nodes"][i] for i in indices]
+    if not _is_unique_path(adjacency, indices):
+        if intermediate_coordinate_systems is None:
+            # if one of the paths has length 1 (there can be at most one, and it is the shortest path), we choose
+            # it straight away, otherwise we raise an expection and ask the user to be more specific
+            if len(path) != 2:
+                # error 1
+                s = _describe_paths(g, _get_all_simple_paths(g, src_node, tgt_node))
+                raise RuntimeError(
+                    "Multiple paths found between the two coordinate systems. Please specify an intermediate "
+                    f"coordinate system. Available paths are:{s}"
+                )
         else:
-            assert isinstance(target_coordinate_system, str)
-            tgt_node = target_coordinate_system
-        paths = list(nx.all_simple_paths(g, source=src_node, target=tgt_node))
-        if len(paths) == 0:
-            # error 0 (we refer to this in the tests)
-            raise RuntimeError("No path found between the two coordinate systems")
-        elif len(paths) > 1:
-            if intermediate_coordinate_systems is None:
-                # if one and only one of the paths has lenght 1, we choose it straight away, otherwise we raise
-                # an expection and ask the user to be more specific
-                paths_with_length_1 = [p for p in paths if len(p) == 2]
-                if len(paths_with_length_1) == 1:
-                    path = paths_with_length_1[0]
-                else:
-                    # error 1
-                    s = _describe_paths(paths)
-                    raise RuntimeError(
-                        "Multiple paths found between the two coordinate systems. Please specify an intermediate "
-                        f"coordinate system. Available paths are:{s}"
-                    )
+            intermediate_node = _resolve_node(g, intermediate_coordinate_systems)
+            paths = [p for p in _get_all_simple_paths(g, src_node, tgt_node) if intermediate_node in p]
+            if len(paths) == 0:
+                # error 2
+                raise RuntimeError("No path found between the two coordinate systems passing through the intermediate")
+            elif len(paths) > 1:
+                # error 3
+                s = _describe_paths(g, paths)
+                raise RuntimeError(
+                    "Multiple paths found between the two coordinate systems passing through the intermediate. "
+                    f"Avaliable paths are:{s}"
+                )
             else:
-                if has_type_spatial_element(intermediate_coordinate_systems):
-                    intermediate_coordinate_systems = id(intermediate_coordinate_systems)
-                paths = [p for p in paths if intermediate_coordinate_systems in p]
-                if len(paths) == 0:
-                    # error 2
-                    raise RuntimeError(
-                        "No path found between the two coordinate systems passing through the intermediate"
-                    )
-                elif len(paths) > 1:
-                    # error 3
-                    s = _describe_paths(paths)
-                    raise RuntimeError(
-                        "Multiple paths found between the two coordinate systems passing through the intermediate. "
-                        f"Avaliable paths are:{s}"
-                    )
-                else:
-                    path = paths[0]
-        else:
-            path = paths[0]
-        transformations = []
-        for i in range(len(path) - 1):
-            transformations.append(g[path[i]][path[i + 1]]["transformation"])
-        sequence = Sequence(transformations)
-        return sequence
+                path = paths[0]
+    if len(path) > 2:
+        composed = _compose_affine_path(g, path)
+        if composed is not None:
+            return composed
+    transformations = []
+    for i in range(len(path) - 1):
+        transformations.append(_get_edge_transformation(g, path[i], path[i + 1]))
+    if len(transformations) == 1:
+        return transformations[0]
+    sequence = Sequence(transformations)
+    return sequence
@@ -9,6 +9,7 @@ import dask_image.ndinterp
 import numpy as np
 from anndata import AnnData
 from dask.array.core import Array as DaskArray
+from dask.base import compute
 from dask.dataframe.core import DataFrame as DaskDataFrame
 from geopandas import GeoDataFrame
 from multiscale_spatial_image import MultiscaleSpatialImage
@@ -41,6 +42,9 @@ def _transform_raster(
     c_channel = [np.zeros(len(binary)).reshape((-1, 1))] if "c" in axes else []
     v: ArrayLike = np.hstack(c_channel + [binary, np.ones(len(binary)).reshape((-1, 1))])
     matrix = transformation.to_affine_matrix(input_axes=axes, output_axes=axes)
+    if np.allclose(matrix, np.eye(len(axes) + 1)):
+        # e.g. a transformation composed with its inverse, there is nothing to resample
+        return data
     inverse_matrix = transformation.inverse().to_affine_matrix(input_axes=axes, output_axes=axes)
     new_v = (matrix @ v.T).T
     c_shape: tuple[int, ...]
@@ -64,6 +68,8 @@ def _transform_raster(
     # fix chunk shape, it should be possible for the user to specify them, and by default we could reuse the chunk shape of the input
     # output_chunks = data.chunks
     ##
+    # dask_image dispatches on the type of the chunks: for cupy-backed dask arrays this calls
+    # cupyx.scipy.ndimage.affine_transform() (and converts the matrix to a cupy array), so the data stays on the GPU
     transformed_dask = dask_image.ndinterp.affine_transform(
         data,
         matrix=inverse_matrix_adjusted,
@@ -195,18 +201,16 @@ def _(data: MultiscaleSpatialImage, transformation: BaseTransformation) -> Multi
 @_transform.register(DaskDataFrame)
 def _(data: DaskDataFrame, transformation: BaseTransformation) -> DaskDataFrame:
     axes = get_dims(data)
-    arrays = []
-    for ax in axes:
-        arrays.append(data[ax].to_dask_array())
-    xdata = DataArray(np.array(arrays).T, coords={"points": range(len(data)), "dim": list(axes)})
+    # the coordinates of all the axes are computed together and stacked in a single (n_points, n_axes) array, so that
+    # the transformation is applied with one matrix product
+    arrays = compute(*[data[ax].to_dask_array() for ax in axes])
+    xdata = DataArray(np.stack(arrays, axis=1), coords={"points": range(len(data)), "dim": list(axes)})
     xtransformed = transformation._transform_coordinates(xdata)
     transformed = data.drop(columns=list(axes))
     assert isinstance(transformed, DaskDataFrame)
     for ax in axes:
-        indices = xtransformed["dim"] == ax
-        new_ax = xtransformed[:, indices].data.flatten()
         # mypy says that from_array is not a method of DaskDataFrame, but it is
-        transformed[ax] = da.from_array(np.array(new_ax))  # type: ignore[attr-defined]
+        transformed[ax] = da.from_array(xtransformed.sel(dim=ax).data)  # type: ignore[attr-defined]
 
     # to avoid cyclic import
     from spatialdata._core.models import PointsModel
@@ -1,4 +1,5 @@
 import copy
+import threading
 from functools import singledispatch
 from typing import Any, Optional, Union
 
@@ -39,6 +40,13 @@ ValidAxis_t = str
 # MappingToCoordinateSystem_t = dict[NgffCoordinateSystem, BaseTransformation]
 MappingToCoordinateSystem_t = dict[str, BaseTransformation]
 
+# counter incremented every time the transformations of an element are set; it is used to know when objects derived
+# from the transformations (e.g. the cached transformations graph of a SpatialData object) need to be recomputed
+_transformations_version = 0
+# transformations can be set from multiple threads (e.g. when unpadding rasters concurrently), an increment lost in a
+# race would make a stale cached graph look up to date
+_transformations_version_lock = threading.Lock()
+
 # added this code as part of a refactoring to catch errors earlier
 
 
@@ -75,6 +83,16 @@ def get_spatial_axes(axes: tuple[ValidAxis_t, ...]) -> tuple[ValidAxis_t, ...]:
     return tuple(ax for ax in axes if ax in [X, Y, Z])
 
 
+def _get_transformations_version() -> int:
+    return _transformations_version
+
+
+def _bump_transformations_version() -> None:
+    global _transformations_version
+    with _transformations_version_lock:
+        _transformations_version += 1
+
+
 def _get_transformations_from_dict_container(dict_container: Any) -> Optional[MappingToCoordinateSystem_t]:
     if TRANSFORM_KEY in dict_container:
         d = dict_container[TRANSFORM_KEY]
@@ -125,6 +143,7 @@ def _set_transformations_to_dict_container(dict_container: Any, transformations:
     if TRANSFORM_KEY not in dict_container:
         dict_container[TRANSFORM_KEY] = {}
     dict_container[TRANSFORM_KEY] = transformations
+    _bump_transformations_version()
 
 
 def _set_transformations_xarray(e: DataArray, transformations: MappingToCoordinateSystem_t) -> None:
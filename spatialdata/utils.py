@@ -9,6 +9,7 @@ from typing import TYPE_CHECKING, Any, Optional, Union
 
 import dask.array as da
 import numpy as np
+from dask.base import compute
 from multiscale_spatial_image import MultiscaleSpatialImage
 from spatial_image import SpatialImage
 from xarray import DataArray
@@ -89,13 +90,13 @@ def unpad_raster(raster: Union[SpatialImage, MultiscaleSpatialImage]) -> Union[S
     """
     from spatialdata._core.models import get_schema
 
-    def _unpad_axis(data: DataArray, axis: str) -> tuple[DataArray, float]:
+    def _get_zero_profile(data: DataArray, axis: str) -> Any:
         others = list(data.dims)
         others.remove(axis)
         # mypy (luca's pycharm config) can't see the isclose method of dask array
-        s = da.isclose(data.sum(dim=others), 0)  # type: ignore[attr-defined]
-        # TODO: rewrite this to use dask array; can't get it to work with it
-        x = s.compute()
+        return da.isclose(data.sum(dim=others), 0)  # type: ignore[attr-defined]
+
+    def _unpad_axis(data: DataArray, axis: str, x: Any) -> tuple[DataArray, float]:
         non_zero = np.where(x == 0)[0]
         if len(non_zero) == 0:
             return data, 0
@@ -109,14 +110,15 @@ def unpad_raster(raster: Union[SpatialImage, MultiscaleSpatialImage]) -> Union[S
 
     axes = get_dims(raster)
     if isinstance(raster, SpatialImage):
+        translation_axes = [ax for ax in axes if ax != "c"]
+        # the padding is zero, so the profiles of all the axes can be computed on the padded raster, with a single pass
+        # over the data
+        profiles = compute(*[_get_zero_profile(raster, ax) for ax in translation_axes])
         unpadded = raster
-        translation_axes = []
         translation_values: list[float] = []
-        for ax in axes:
-            if ax != "c":
-                unpadded, left_pad = _unpad_axis(unpadded, axis=ax)
-                translation_axes.append(ax)
-                translation_values.append(left_pad)
+        for ax, profile in zip(translation_axes, profiles):
+            unpadded, left_pad = _unpad_axis(unpadded, axis=ax, x=profile)
+            translation_values.append(left_pad)
         translation = Translation(translation_values, axes=tuple(translation_axes))
         old_transformations = get_transformation(element=raster, get_all=True)
         assert isinstance(old_transformations, dict)
@@ -1,14 +1,20 @@
 import math
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
+from typing import Any
 
+import dask
 import numpy as np
 import pytest
-import scipy.misc
+import shapely
 from multiscale_spatial_image import MultiscaleSpatialImage
 from spatial_image import SpatialImage
 
 from spatialdata import SpatialData
 from spatialdata._core._spatialdata_ops import (
+    _build_transformations_graph,
+    _is_invertible,
     get_transformation,
     get_transformation_between_coordinate_systems,
     remove_transformation,
@@ -16,7 +22,15 @@ from spatialdata._core._spatialdata_ops import (
 )
 from spatialdata._core.core_utils import get_dims
 from spatialdata._core.models import Image2DModel
-from spatialdata._core.transformations import Affine, Identity, Scale, Translation
+from spatialdata._core.transformations import (
+    Affine,
+    BaseTransformation,
+    Identity,
+    MapAxis,
+    Scale,
+    Sequence,
+    Translation,
+)
 from spatialdata.utils import unpad_raster
 
 
@@ -83,6 +97,7 @@ class TestElementsTransform:
         assert new_sdata.coordinate_systems["test"]._axes[0].unit == "micrometers"
 
 
+@lru_cache(maxsize=None)
 def _get_affine(small_translation: bool = True) -> Affine:
     theta = math.pi / 18
     k = 10.0 if small_translation else 1.0
@@ -97,16 +112,24 @@ def _get_affine(small_translation: bool = True) -> Affine:
     )
 
 
+@lru_cache(maxsize=None)
+def _get_affine_and_inverse(small_translation: bool = True) -> tuple[Affine, BaseTransformation]:
+    affine = _get_affine(small_translation)
+    return affine, affine.inverse()
+
+
 def _unpad_rasters(sdata: SpatialData) -> SpatialData:
-    new_images = {}
-    new_labels = {}
-    for name, image in sdata.images.items():
-        unpadded = unpad_raster(image)
-        new_images[name] = unpadded
-    for name, label in sdata.labels.items():
-        unpadded = unpad_raster(label)
-        new_labels[name] = unpadded
-    return SpatialData(images=new_images, labels=new_labels)
+    rasters = [("images", name, image) for name, image in sdata.images.items()] + [
+        ("labels", name, label) for name, label in sdata.labels.items()
+    ]
+    new_elements: dict[str, dict[str, Any]] = {"images": {}, "labels": {}}
+    if len(rasters) > 0:
+        # the rasters are independent, so they can be unpadded concurrently
+        with ThreadPoolExecutor(max_workers=min(8, len(rasters))) as executor:
+            unpadded = executor.map(unpad_raster, [raster for _, _, raster in rasters])
+            for (element_type, name, _), new_raster in zip(rasters, unpadded):
+                new_elements[element_type][name] = new_raster
+    return SpatialData(images=new_elements["images"], labels=new_elements["labels"])
 
 
 # TODO: when the io for 3D images and 3D labels work, add those tests
@@ -115,13 +138,15 @@ def test_transform_image_spatial_image(images: SpatialData):
 
     VISUAL_DEBUG = False
     if VISUAL_DEBUG:
+        import scipy.misc
+
         im = scipy.misc.face()
         im_element = Image2DModel.parse(im, dims=["y", "x", "c"])
         del sdata.images["image2d"]
         sdata.images["face"] = im_element
 
-    affine = _get_affine(small_translation=False)
-    padded = affine.inverse().transform(affine.transform(sdata))
+    affine, inverse = _get_affine_and_inverse(small_translation=False)
+    padded = inverse.transform(affine.transform(sdata))
     _unpad_rasters(padded)
     # raise NotImplementedError("TODO: plot the images")
     # raise NotImplementedError("TODO: compare the transformed images with the original ones")
@@ -129,8 +154,8 @@ def test_transform_image_spatial_image(images: SpatialData):
 
 def test_transform_image_spatial_multiscale_spatial_image(images: SpatialData):
     sdata = SpatialData(images={k: v for k, v in images.images.items() if isinstance(v, MultiscaleSpatialImage)})
-    affine = _get_affine()
-    padded = affine.inverse().transform(affine.transform(sdata))
+    affine, inverse = _get_affine_and_inverse()
+    padded = inverse.transform(affine.transform(sdata))
     _unpad_rasters(padded)
     # TODO: unpad the image
     # raise NotImplementedError("TODO: compare the transformed images with the original ones")
@@ -138,8 +163,8 @@ def test_transform_image_spatial_multiscale_spatial_image(images: SpatialData):
 
 def test_transform_labels_spatial_image(labels: SpatialData):
     sdata = SpatialData(labels={k: v for k, v in labels.labels.items() if isinstance(v, SpatialImage)})
-    affine = _get_affine()
-    padded = affine.inverse().transform(affine.transform(sdata))
+    affine, inverse = _get_affine_and_inverse()
+    padded = inverse.transform(affine.transform(sdata))
     _unpad_rasters(padded)
     # TODO: unpad the labels
     # raise NotImplementedError("TODO: compare the transformed images with the original ones")
@@ -147,48 +172,62 @@ def test_transform_labels_spatial_image(labels: SpatialData):
 
 def test_transform_labels_spatial_multiscale_spatial_image(labels: SpatialData):
     sdata = SpatialData(labels={k: v for k, v in labels.labels.items() if isinstance(v, MultiscaleSpatialImage)})
-    affine = _get_affine()
-    padded = affine.inverse().transform(affine.transform(sdata))
+    affine, inverse = _get_affine_and_inverse()
+    padded = inverse.transform(affine.transform(sdata))
     _unpad_rasters(padded)
     # TODO: unpad the labels
     # raise NotImplementedError("TODO: compare the transformed images with the original ones")
 
 
+def test_transform_raster_fused_roundtrip(images: SpatialData, labels: SpatialData):
+    sdata = SpatialData(
+        images={k: v for k, v in images.images.items() if isinstance(v, SpatialImage)},
+        labels={k: v for k, v in labels.labels.items() if isinstance(v, SpatialImage)},
+    )
+    affine, inverse = _get_affine_and_inverse()
+    # the composition of the affine with its inverse is the identity, so the rasters are not resampled
+    new_sdata = Sequence([affine, inverse]).transform(sdata)
+    for element_type in ["images", "labels"]:
+        for k, v in getattr(sdata, element_type).items():
+            new_v = getattr(new_sdata, element_type)[k]
+            assert new_v.shape == v.shape
+            assert np.array_equal(new_v.data.compute(), v.data.compute())
+
+
 # TODO: maybe add methods for comparing the coordinates of elements so the below code gets less verbose
 def test_transform_points(points: SpatialData):
-    affine = _get_affine()
-    new_points = affine.inverse().transform(affine.transform(points))
+    affine, inverse = _get_affine_and_inverse()
+    new_points = inverse.transform(affine.transform(points))
     keys0 = list(points.points.keys())
     keys1 = list(new_points.points.keys())
     assert keys0 == keys1
     for k in keys0:
         p0 = points.points[k]
         p1 = new_points.points[k]
-        axes0 = get_dims(p0)
-        axes1 = get_dims(p1)
-        assert axes0 == axes1
-        for ax in axes0:
-            x0 = p0[ax].to_dask_array().compute()
-            x1 = p1[ax].to_dask_array().compute()
+        axes = get_dims(p0)
+        assert get_dims(p1) == axes
+        # a single compute for all the axes of both the dataframes
+        computed = dask.compute(*[p0[ax].to_dask_array() for ax in axes], *[p1[ax].to_dask_array() for ax in axes])
+        for x0, x1 in zip(computed[: len(axes)], computed[len(axes) :]):
             assert np.allclose(x0, x1)
 
 
 def test_transform_polygons(polygons: SpatialData):
-    affine = _get_affine()
-    new_polygons = affine.inverse().transform(affine.transform(polygons))
+    affine, inverse = _get_affine_and_inverse()
+    new_polygons = inverse.transform(affine.transform(polygons))
     keys0 = list(polygons.polygons.keys())
     keys1 = list(new_polygons.polygons.keys())
     assert keys0 == keys1
     for k in keys0:
         p0 = polygons.polygons[k]
         p1 = new_polygons.polygons[k]
-        for i in range(len(p0.geometry)):
-            assert p0.geometry.iloc[i].almost_equals(p1.geometry.iloc[i])
+        # same tolerance as the default of almost_equals(), i.e. 6 decimal places
+        assert np.all(shapely.equals_exact(p0.geometry.to_numpy(), p1.geometry.to_numpy(), tolerance=0.5 * 10**-6))
 
 
 def test_transform_shapes(shapes: SpatialData):
-    affine = _get_affine()
-    new_shapes = affine.inverse().transform(affine.transform(shapes))
+    affine, inverse = _get_affine_and_inverse()
+    new_shapes = inverse.transform(affine.transform(shapes))
     keys0 = list(shapes.shapes.keys())
     keys1 = list(new_shapes.shapes.keys())
     assert keys0 == keys1
@@ -198,18 +237,42 @@ def test_transform_shapes(shapes: SpatialData):
         assert np.allclose(p0.obsm["spatial"], p1.obsm["spatial"])
 
 
-def test_map_coordinate_systems_single_path(full_sdata: SpatialData):
-    scale = Scale([2], axes=("x",))
-    translation = Translation([100], axes=("x",))
+# expected affine matrices (input and output axes ("x", "y")) for the test_map_coordinate_systems_* tests
+_M_SCALE_X2 = np.array([[2, 0, 0], [0, 1, 0], [0, 0, 1]])
+_M_SCALE_X0_5 = np.array([[0.5, 0, 0], [0, 1, 0], [0, 0, 1]])
+_M_TRANSLATION_X100 = np.array([[1, 0, 100], [0, 1, 0], [0, 0, 1]])
+_M_TRANSLATION_X_MINUS_100 = np.array([[1, 0, -100], [0, 1, 0], [0, 0, 1]])
+_M_SCALE_X0_5_TRANSLATION_X100 = np.array([[0.5, 0, 100], [0, 1, 0], [0, 0, 1]])
+_M_SCALE_X64 = np.array([[64.0, 0, 0], [0, 1, 0], [0, 0, 1]])
+
+# transformations used by the test_map_coordinate_systems_* tests (they are not modified by the tests)
+_SCALE_X2 = Scale([2], axes=("x",))
+_SCALE_X0_5 = _SCALE_X2.inverse()
+_TRANSLATION_X100 = Translation([100], axes=("x",))
+# not invertible, as it maps 2D points to 3D
+_AFFINE_XY_TO_XYC = Affine(
+    np.array(
+        [
+            [1, 0, 0],
+            [0, 1, 0],
+            [0, 0, 1],
+            [0, 0, 1],
+        ]
+    ),
+    input_axes=("x", "y"),
+    output_axes=("x", "y", "c"),
+)
+
 
+def test_map_coordinate_systems_single_path(full_sdata: SpatialData):
     im = full_sdata.images["image2d_multiscale"]
     la = full_sdata.labels["labels2d"]
     po = full_sdata.polygons["multipoly"]
 
-    set_transformation(im, scale)
-    set_transformation(po, translation)
-    set_transformation(po, translation, "my_space")
-    set_transformation(po, scale)
+    set_transformation(im, _SCALE_X2)
+    set_transformation(po, _TRANSLATION_X100)
+    set_transformation(po, _TRANSLATION_X100, "my_space")
+    set_transformation(po, _SCALE_X2)
     # identity
     assert (
         get_transformation_between_coordinate_systems(
@@ -223,6 +286,8 @@ def test_map_coordinate_systems_single_path(full_sdata: SpatialData):
         )
         == Identity()
     )
+    # the identity is returned without building the transformations graph
+    assert full_sdata._transformations_graph_cache is None
 
     # intrinsic coordinate system (element) to extrinsic coordinate system and back
     t0 = get_transformation_between_coordinate_systems(
@@ -237,61 +302,29 @@ def test_map_coordinate_systems_single_path(full_sdata: SpatialData):
     t3 = get_transformation_between_coordinate_systems(
         full_sdata, source_coordinate_system="my_space", target_coordinate_system=po
     )
-    assert np.allclose(
-        t0.to_affine_matrix(input_axes=("x", "y"), output_axes=("x", "y")),
-        np.array(
-            [
-                [2, 0, 0],
-                [0, 1, 0],
-                [0, 0, 1],
-            ]
-        ),
-    )
+    # paths of length 1 are not wrapped in a Sequence
+    assert t0 is _SCALE_X2
+    m0 = t0.to_affine_matrix(input_axes=("x", "y"), output_axes=("x", "y"))
+    assert np.allclose(m0, _M_SCALE_X2)
     assert np.allclose(
         t1.to_affine_matrix(input_axes=("x", "y"), output_axes=("x", "y")),
-        np.array(
-            [
-                [0.5, 0, 0],
-                [0, 1, 0],
-                [0, 0, 1],
-            ]
-        ),
+        _M_SCALE_X0_5,
     )
     assert np.allclose(
         t2.to_affine_matrix(input_axes=("x", "y"), output_axes=("x", "y")),
-        np.array(
-            [
-                [1, 0, 100],
-                [0, 1, 0],
-                [0, 0, 1],
-            ]
-        ),
+        _M_TRANSLATION_X100,
     )
     assert np.allclose(
         t3.to_affine_matrix(input_axes=("x", "y"), output_axes=("x", "y")),
-        np.array(
-            [
-                [1, 0, -100],
-                [0, 1, 0],
-                [0, 0, 1],
-            ]
-        ),
+        _M_TRANSLATION_X_MINUS_100,
     )
 
     # intrinsic to intrinsic (element to element)
     t4 = get_transformation_between_coordinate_systems(
         full_sdata, source_coordinate_system=im, target_coordinate_system=la
     )
-    assert np.allclose(
-        t4.to_affine_matrix(input_axes=("x", "y"), output_axes=("x", "y")),
-        np.array(
-            [
-                [2, 0, 0],
-                [0, 1, 0],
-                [0, 0, 1],
-            ]
-        ),
-    )
+    # same matrix as im -> global, since la is mapped to global by the identity
+    assert np.allclose(t4.to_affine_matrix(input_axes=("x", "y"), output_axes=("x", "y")), m0)
 
     # extrinsic to extrinsic
     t5 = get_transformation_between_coordinate_systems(
@@ -299,30 +332,26 @@ def test_map_coordinate_systems_single_path(full_sdata: SpatialData):
     )
     assert np.allclose(
         t5.to_affine_matrix(input_axes=("x", "y"), output_axes=("x", "y")),
-        np.array(
-            [
-                [0.5, 0, 100],
-                [0, 1, 0],
-                [0, 0, 1],
-            ]
-        ),
+        _M_SCALE_X0_5_TRANSLATION_X100,
     )
 
 
 def test_map_coordinate_systems_zero_or_multiple_paths(full_sdata):
-    scale = Scale([2], axes=("x",))
-
     im = full_sdata.images["image2d_multiscale"]
     la = full_sdata.labels["labels2d"]
 
-    set_transformation(im, scale, "my_space0")
-    set_transformation(la, scale, "my_space0")
+    set_transformation(im, _SCALE_X2, "my_space0")
+    set_transformation(la, _SCALE_X2, "my_space0")
 
     # error 0
     with pytest.raises(RuntimeError):
         get_transformation_between_coordinate_systems(
             full_sdata, source_coordinate_system="my_space0", target_coordinate_system="globalE"
         )
+    with pytest.raises(RuntimeError):
+        get_transformation_between_coordinate_systems(
+            full_sdata, source_coordinate_system="globalE", target_coordinate_system="my_space0"
+        )
 
     # error 1
     with pytest.raises(RuntimeError):
@@ -338,13 +367,7 @@ def test_map_coordinate_systems_zero_or_multiple_paths(full_sdata):
     )
     assert np.allclose(
         t.to_affine_matrix(input_axes=("x", "y"), output_axes=("x", "y")),
-        np.array(
-            [
-                [0.5, 0, 0],
-                [0, 1, 0],
-                [0, 0, 1],
-            ]
-        ),
+        _M_SCALE_X0_5,
     )
     # error 2
     with pytest.raises(RuntimeError):
@@ -365,20 +388,8 @@ def test_map_coordinate_systems_zero_or_multiple_paths(full_sdata):
 
 
 def test_map_coordinate_systems_non_invertible_transformations(full_sdata):
-    affine = Affine(
-        np.array(
-            [
-                [1, 0, 0],
-                [0, 1, 0],
-                [0, 0, 1],
-                [0, 0, 1],
-            ]
-        ),
-        input_axes=("x", "y"),
-        output_axes=("x", "y", "c"),
-    )
     im = full_sdata.images["image2d_multiscale"]
-    set_transformation(im, affine)
+    set_transformation(im, _AFFINE_XY_TO_XYC)
     t = get_transformation_between_coordinate_systems(
         full_sdata, source_coordinate_system=im, target_coordinate_system="global"
     )
@@ -406,23 +417,21 @@ def test_map_coordinate_systems_long_path(full_sdata):
     la1 = full_sdata.labels["labels2d_multiscale"]
     po = full_sdata.polygons["multipoly"]
 
-    scale = Scale([2], axes=("x",))
-
     remove_transformation(im, remove_all=True)
-    set_transformation(im, scale.inverse(), "my_space0")
-    set_transformation(im, scale, "my_space1")
+    set_transformation(im, _SCALE_X0_5, "my_space0")
+    set_transformation(im, _SCALE_X2, "my_space1")
 
     remove_transformation(la0, remove_all=True)
-    set_transformation(la0, scale.inverse(), "my_space1")
-    set_transformation(la0, scale, "my_space2")
+    set_transformation(la0, _SCALE_X0_5, "my_space1")
+    set_transformation(la0, _SCALE_X2, "my_space2")
 
     remove_transformation(la1, remove_all=True)
-    set_transformation(la1, scale.inverse(), "my_space1")
-    set_transformation(la1, scale, "my_space2")
+    set_transformation(la1, _SCALE_X0_5, "my_space1")
+    set_transformation(la1, _SCALE_X2, "my_space2")
 
     remove_transformation(po, remove_all=True)
-    set_transformation(po, scale.inverse(), "my_space2")
-    set_transformation(po, scale, "my_space3")
+    set_transformation(po, _SCALE_X0_5, "my_space2")
+    set_transformation(po, _SCALE_X2, "my_space3")
 
     with pytest.raises(RuntimeError):
         # error 1
@@ -438,20 +447,121 @@ def test_map_coordinate_systems_long_path(full_sdata):
     )
     assert np.allclose(
         t.to_affine_matrix(input_axes=("x", "y"), output_axes=("x", "y")),
-        np.array(
-            [
-                [64.0, 0, 0],
-                [0, 1, 0],
-                [0, 0, 1],
-            ]
-        ),
+        _M_SCALE_X64,
+    )
+
+
+def test_transformations_graph_cache(full_sdata):
+    im = full_sdata.images["image2d_multiscale"]
+    g0 = _build_transformations_graph(full_sdata)
+    assert _build_transformations_graph(full_sdata) is g0
+
+    # setting a transformation invalidates the cache
+    set_transformation(im, Scale([2], axes=("x",)), "my_space")
+    g1 = _build_transformations_graph(full_sdata)
+    assert g1 is not g0
+    assert "my_space" in g1.nodes
+
+    # same for elements whose transformations are updated in place (not multiscale)
+    la = full_sdata.labels["labels2d"]
+    set_transformation(la, Scale([2], axes=("x",)), "my_other_space")
+    g1 = _build_transformations_graph(full_sdata)
+    assert "my_other_space" in g1.nodes
+
+    # removing a transformation invalidates the cache
+    remove_transformation(im, "my_space")
+    g2 = _build_transformations_graph(full_sdata)
+    assert g2 is not g1
+    assert "my_space" not in g2.nodes
+    with pytest.raises(ValueError):
+        remove_transformation(im, "my_space")
+
+    # removing an element invalidates the cache
+    del full_sdata.images["image2d_multiscale"]
+    g3 = _build_transformations_graph(full_sdata)
+    assert g3 is not g2
+    assert id(im) not in g3.graph["element_index"]
+    assert ("images", "image2d_multiscale") not in g3.graph["elements"]
+    with pytest.raises(ValueError):
+        get_transformation_between_coordinate_systems(full_sdata, im, "global")
+    with pytest.raises(ValueError):
+        get_transformation_between_coordinate_systems(full_sdata, im, im)
+
+
+def test_transformations_graph_inverses(full_sdata):
+    im = full_sdata.images["image2d_multiscale"]
+    set_transformation(im, Scale([2], axes=("x",)), "my_space")
+    g = _build_transformations_graph(full_sdata)
+    i = g.graph["element_index"][id(im)]
+    # a single edge per (element, coordinate system) pair, the inverse is computed when a path goes through it backwards
+    assert g["my_space"][i]["forward_from"] == i
+    t = get_transformation_between_coordinate_systems(full_sdata, "my_space", im)
+    assert t.to_affine_matrix(input_axes=("x", "y"), output_axes=("x", "y"))[0, 0] == 0.5
+
+    assert _is_invertible(Sequence([Scale([2], axes=("x",)), Translation([1], axes=("x",))]))
+    assert not _is_invertible(Scale([0], axes=("x",)))
+    assert not _is_invertible(MapAxis({"x": "x", "y": "x"}))
+    assert not _is_invertible(
+        Affine(np.array([[1, 2, 0], [2, 4, 0], [0, 0, 1]]), input_axes=("x", "y"), output_axes=("x", "y"))
     )
+    assert not _is_invertible(Sequence([Identity(), Scale([0], axes=("x",))]))
+
+
+def test_transformations_graph_in_place_edit(full_sdata):
+    po = full_sdata.polygons["multipoly"]
+    scale = Scale([2], axes=("x",))
+    set_transformation(po, scale, "my_space")
+    t = get_transformation_between_coordinate_systems(full_sdata, "my_space", po)
+    assert t.to_affine_matrix(input_axes=("x", "y"), output_axes=("x", "y"))[0, 0] == 0.5
+
+    # modifying the transformation in place doesn't invalidate the cached graph, both the directions of the edge need
+    # to reflect the change
+    scale.scale[0] = 4.0
+    t = get_transformation_between_coordinate_systems(full_sdata, po, "my_space")
+    assert t.to_affine_matrix(input_axes=("x", "y"), output_axes=("x", "y"))[0, 0] == 4.0
+    t = get_transformation_between_coordinate_systems(full_sdata, "my_space", po)
+    assert t.to_affine_matrix(input_axes=("x", "y"), output_axes=("x", "y"))[0, 0] == 0.25
+
+
+def test_transformations_graph_in_place_edit_invertibility(full_sdata):
+    po = full_sdata.polygons["multipoly"]
+    affine = Affine(np.array([[2, 0, 0], [0, 1, 0], [0, 0, 1]]), input_axes=("x", "y"), output_axes=("x", "y"))
+    set_transformation(po, affine, "my_space")
+    get_transformation_between_coordinate_systems(full_sdata, "my_space", po)
+
+    # the transformation becomes singular: the edge can't be walked backwards anymore
+    affine.matrix[0, 0] = 0
+    with pytest.raises(RuntimeError):
+        # error 0
+        get_transformation_between_coordinate_systems(full_sdata, "my_space", po)
+
+    # and it can be walked again once the transformation is invertible
+    affine.matrix[0, 0] = 4
+    t = get_transformation_between_coordinate_systems(full_sdata, "my_space", po)
+    assert t.to_affine_matrix(input_axes=("x", "y"), output_axes=("x", "y"))[0, 0] == 0.25
+
+
+def test_map_coordinate_systems_affine_chain(full_sdata):
+    im = full_sdata.images["image2d_multiscale"]
+    la = full_sdata.labels["labels2d"]
+    a0 = _get_affine()
+    a1 = Affine(np.array([[1, 0, 5], [0, 3, 0], [0, 0, 1]]), input_axes=("x", "y"), output_axes=("x", "y"))
+    remove_transformation(im, remove_all=True)
+    remove_transformation(la, remove_all=True)
+    set_transformation(im, a0, "my_space")
+    set_transformation(la, a1, "my_space")
+
+    # a chain of affine transformations is composed into a single affine transformation
+    t = get_transformation_between_coordinate_systems(full_sdata, im, la)
+    assert isinstance(t, Affine)
+    expected = Sequence([a0, a1.inverse()]).to_affine_matrix(input_axes=("x", "y"), output_axes=("x", "y"))
+    assert np.allclose(t.to_affine_matrix(input_axes=("x", "y"), output_axes=("x", "y")), expected)
 
 
 def test_transform_elements_and_entire_spatial_data_object(sdata: SpatialData):
     # TODO: we are just applying the transformation, we are not checking it is correct. We could improve this test
-    scale = Scale([2], axes=("x",))
-    for element in sdata._gen_elements_values():
-        set_transformation(element, scale, "my_space")
+    elements = list(sdata._gen_elements_values())
+    for element in elements:
+        set_transformation(element, _SCALE_X2, "my_space")
         sdata.transform_element_to_coordinate_system(element, "my_space")
     sdata.transform_to_coordinate_system("my_space")
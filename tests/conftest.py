@@ -1,4 +1,5 @@
-from typing import Optional, Union
+from copy import deepcopy
+from typing import Any, Optional, Union
 
 import numpy as np
 import pandas as pd
@@ -25,29 +26,56 @@ from spatialdata._core.models import (
 RNG = default_rng()
 
 
+# building the elements (in particular the multiscale ones) is much slower than copying them, so they are built once
+# per session and each test gets a deep copy; the tests are free to modify them (e.g. their transformations)
+@pytest.fixture(scope="session")
+def _images() -> dict[str, Union[SpatialImage, MultiscaleSpatialImage]]:
+    return _get_images()
+
+
+@pytest.fixture(scope="session")
+def _labels() -> dict[str, Union[SpatialImage, MultiscaleSpatialImage]]:
+    return _get_labels()
+
+
+@pytest.fixture(scope="session")
+def _polygons() -> dict[str, GeoDataFrame]:
+    return _get_polygons()
+
+
+@pytest.fixture(scope="session")
+def _shapes() -> dict[str, AnnData]:
+    return _get_shapes()
+
+
+@pytest.fixture(scope="session")
+def _points() -> dict[str, DaskDataFrame]:
+    return _get_points()
+
+
 @pytest.fixture()
-def images() -> SpatialData:
-    return SpatialData(images=_get_images())
+def images(_images) -> SpatialData:
+    return SpatialData(images=_deepcopy_elements(_images))
 
 
 @pytest.fixture()
-def labels() -> SpatialData:
-    return SpatialData(labels=_get_labels())
+def labels(_labels) -> SpatialData:
+    return SpatialData(labels=_deepcopy_elements(_labels))
 
 
 @pytest.fixture()
-def polygons() -> SpatialData:
-    return SpatialData(polygons=_get_polygons())
+def polygons(_polygons) -> SpatialData:
+    return SpatialData(polygons=_deepcopy_elements(_polygons))
 
 
 @pytest.fixture()
-def shapes() -> SpatialData:
-    return SpatialData(shapes=_get_shapes())
+def shapes(_shapes) -> SpatialData:
+    return SpatialData(shapes=_deepcopy_elements(_shapes))
 
 
 @pytest.fixture()
-def points() -> SpatialData:
-    return SpatialData(points=_get_points())
+def points(_points) -> SpatialData:
+    return SpatialData(points=_deepcopy_elements(_points))
 
 
 @pytest.fixture()
@@ -61,13 +89,13 @@ def table_multiple_annotations() -> SpatialData:
 
 
 @pytest.fixture()
-def full_sdata() -> SpatialData:
+def full_sdata(_images, _labels, _polygons, _shapes, _points) -> SpatialData:
     return SpatialData(
-        images=_get_images(),
-        labels=_get_labels(),
-        polygons=_get_polygons(),
-        shapes=_get_shapes(),
-        points=_get_points(),
+        images=_deepcopy_elements(_images),
+        labels=_deepcopy_elements(_labels),
+        polygons=_deepcopy_elements(_polygons),
+        shapes=_deepcopy_elements(_shapes),
+        points=_deepcopy_elements(_points),
         table=_get_table(region="sample1"),
     )
 
@@ -98,14 +126,7 @@ def empty_table() -> SpatialData:
 )
 def sdata(request) -> SpatialData:
     if request.param == "full":
-        s = SpatialData(
-            images=_get_images(),
-            labels=_get_labels(),
-            polygons=_get_polygons(),
-            shapes=_get_shapes(),
-            points=_get_points(),
-            table=_get_table("sample1"),
-        )
+        s = request.getfixturevalue("full_sdata")
     elif request.param == "empty":
         s = SpatialData()
     else:
@@ -114,6 +135,20 @@ def sdata(request) -> SpatialData:
     return s
 
 
+def _deepcopy_elements(elements: dict[str, Any]) -> dict[str, Any]:
+    copied = {}
+    for name, element in elements.items():
+        if isinstance(element, MultiscaleSpatialImage):
+            # deepcopy() of a MultiscaleSpatialImage returns a plain DataTree, so we rebuild it from the copied levels
+            copied[name] = MultiscaleSpatialImage.from_dict(element.copy(deep=True).to_dict())
+        else:
+            copied[name] = deepcopy(element)
+            if isinstance(element, (GeoDataFrame, DaskDataFrame)):
+                # deepcopy() of a dataframe doesn't copy its attrs, where the transformations are stored
+                copied[name].attrs = deepcopy(element.attrs)
+    return copied
+
+
 def _get_images() -> dict[str, Union[SpatialImage, MultiscaleSpatialImage]]:
     out = {}
     dims_2d = ("c", "y", "x")
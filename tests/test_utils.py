@@ -1,6 +1,7 @@
 import itertools
 
 import dask_image.ndinterp
+import numpy as np
 import xarray
 import xarray.testing
 from multiscale_spatial_image import MultiscaleSpatialImage
@@ -8,24 +9,18 @@ from spatial_image import SpatialImage
 from xarray import DataArray
 
 from spatialdata._core.models import get_schema
-from spatialdata._core.transformations import Affine
 from spatialdata.utils import unpad_raster
 
 
 def _pad_raster(data: DataArray, axes: tuple[str, ...]) -> DataArray:
-    new_shape = tuple([data.shape[i] * (2 if axes[i] != "c" else 1) for i in range(len(data.shape))])
-    x = data.shape[axes.index("x")]
-    y = data.shape[axes.index("y")]
-    affine = Affine(
-        [
-            [1, 0, -x / 2.0],
-            [0, 1, -y / 2.0],
-            [0, 0, 1],
-        ],
-        input_axes=("x", "y"),
-        output_axes=("x", "y"),
-    )
-    matrix = affine.to_affine_matrix(input_axes=axes, output_axes=axes)
+    positions = {ax: i for i, ax in enumerate(axes)}
+    ix, iy = positions["x"], positions["y"]
+    ic = positions.get("c", -1)
+    new_shape = tuple(data.shape[i] * (1 if i == ic else 2) for i in range(len(axes)))
+    # translation by (-x / 2, -y / 2), built directly in the axes of the raster
+    matrix = np.eye(len(axes) + 1)
+    matrix[ix, -1] = -data.shape[ix] / 2.0
+    matrix[iy, -1] = -data.shape[iy] / 2.0
     transformed = dask_image.ndinterp.affine_transform(data, matrix, output_shape=new_shape)
     return transformed
 
@@ -38,7 +33,7 @@ def test_unpad_raster(images, labels) -> None:
         elif isinstance(raster, MultiscaleSpatialImage):
             d = dict(raster["scale0"])
             assert len(d) == 1
-            data = d.values().__iter__().__next__()
+            data = next(iter(d.values()))
         else:
             raise ValueError(f"Unknown type: {type(raster)}")
         padded = _pad_raster(data.data, data.dims)
@@ -57,6 +52,6 @@ def test_unpad_raster(images, labels) -> None:
             assert len(d0) == 1
             d1 = dict(unpadded["scale0"])
             assert len(d1) == 1
-            xarray.testing.assert_equal(d0.values().__iter__().__next__(), d1.values().__iter__().__next__())
+            xarray.testing.assert_equal(next(iter(d0.values())), next(iter(d1.values())))
         else:
             raise ValueError(f"Unknown type: {type(raster)}")